@@ -3,9 +3,15 @@
 
 import os
 import json
+import hashlib
+import threading
 import streamlit as st
+import torch
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
 
+from langchain_core.runnables import RunnableLambda
+
 from pdf_loader import PDFLoader
 from embedder import DocumentEmbedder
 from rag_pipeline import RAGPipeline
@@ -17,60 +23,156 @@ st.set_page_config(
     layout="wide"
 )
 
-# Constant for GROQ API Key (replace with your actual API key)
-GROQ_API_KEY = "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"
+# GROQ API key, read once from Streamlit secrets (falling back to the
+# environment) and passed to the pipeline directly — never hardcoded
+try:
+    GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
+except (KeyError, FileNotFoundError):
+    GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")
+
+# Use all cores for torch CPU inference
+torch.set_num_threads(os.cpu_count())
+
+# Shared (cross-session) heavy resources. st.cache_resource keeps one
+# instance per process, so reruns and new sessions reuse the same loaded
+# model instead of re-initializing it.
+@st.cache_resource
+def get_embedder():
+    # Construction is cheap: the embedding model loads lazily on the
+    # first "Process PDFs" click, so the UI renders instantly on cold start
+    return DocumentEmbedder(
+        embedding_model_name="all-MiniLM-L6-v2",
+        vector_store_type="faiss"
+    )
+
+@st.cache_resource
+def get_rag_pipeline():
+    return RAGPipeline(
+        groq_api_key=GROQ_API_KEY,
+        model_name="llama3-70b-8192"  # Change to your preferred model
+    )
 
 # Initialize session state
 def init_session_state():
     if "pdf_docs" not in st.session_state:
         st.session_state.pdf_docs = {}  # Dictionary to store PDF documents
-    
-    if "vector_stores" not in st.session_state:
-        st.session_state.vector_stores = {}  # Dictionary to store vector stores
-    
+
     if "current_pdf" not in st.session_state:
         st.session_state.current_pdf = None  # Currently selected PDF
     
     if "preview_text" not in st.session_state:
         st.session_state.preview_text = ""  # Preview text from the selected PDF
+
+    if "chains" not in st.session_state:
+        st.session_state.chains = {}  # Built chains keyed by (pdf_name, chain_type)
+
+    if "retrieval_cache" not in st.session_state:
+        st.session_state.retrieval_cache = {}  # Prefetched docs keyed by (pdf_name, chain_type)
     
     if "pdf_loader" not in st.session_state:
         st.session_state.pdf_loader = PDFLoader()  # PDF loader instance
     
-    if "embedder" not in st.session_state:
-        st.session_state.embedder = DocumentEmbedder(
-            embedding_model_name="all-MiniLM-L6-v2",
-            vector_store_type="faiss"
-        )
-    
-    if "rag_pipeline" not in st.session_state:
-        st.session_state.rag_pipeline = RAGPipeline(
-            groq_api_key=GROQ_API_KEY,
-            model_name="llama3-70b-8192"  # Change to your preferred model
-        )
+    # Heavy resources are cached per-process, not per-session
+    st.session_state.embedder = get_embedder()
+    st.session_state.rag_pipeline = get_rag_pipeline()
 
 # Function to load PDFs
 def load_pdfs(uploaded_files):
-    for pdf_file in uploaded_files:
-        if pdf_file.name not in st.session_state.pdf_docs:
-            try:
-                with st.spinner(f"Processing {pdf_file.name}..."):
-                    # Load PDF and extract text
-                    documents = st.session_state.pdf_loader.load_pdf(pdf_file)
-                    
-                    # Store the documents
-                    st.session_state.pdf_docs[pdf_file.name] = documents
-                    
-                    # Create vector store
-                    vector_store = st.session_state.embedder.create_vector_store(documents)
-                    st.session_state.vector_stores[pdf_file.name] = vector_store
-                    
-                    # Save the vector store
-                    st.session_state.embedder.save_vector_store(pdf_file.name)
-                    
-                    st.success(f"Successfully processed {pdf_file.name}")
-            except Exception as e:
-                st.error(f"Error processing {pdf_file.name}: {str(e)}")
+    new_files = [f for f in uploaded_files if f.name not in st.session_state.pdf_docs]
+    if not new_files:
+        return
+
+    embedder = st.session_state.embedder
+    pdf_loader = st.session_state.pdf_loader
+
+    # Check the on-disk cache first: indices are keyed by a hash of the
+    # file bytes, so re-uploading the same PDF (even under another name
+    # or in a fresh session) skips extraction and embedding entirely
+    to_process = []
+    digests = {}
+    for pdf_file in new_files:
+        digest = hashlib.blake2b(pdf_file.getvalue(), digest_size=16).hexdigest()
+        digests[pdf_file.name] = digest
+
+        cached_documents = embedder.load_processed_pdf(digest, source=pdf_file.name)
+
+        if cached_documents is not None:
+            st.session_state.pdf_docs[pdf_file.name] = cached_documents
+            # Retrievers and prefetched docs point at the old index
+            st.session_state.chains.clear()
+            st.session_state.retrieval_cache.clear()
+            st.success(f"Loaded {pdf_file.name} from cache")
+        else:
+            to_process.append(pdf_file)
+
+    if not to_process:
+        return
+
+    # PDF parsing and splitting are independent per file and release the
+    # GIL in PyMuPDF, so run them in a thread pool
+    def parse_and_split(pdf_file):
+        documents = pdf_loader.load_pdf(pdf_file)
+        chunks = embedder.process_documents(documents)
+        return pdf_file.name, documents, chunks
+
+    with st.spinner(f"Processing {len(to_process)} PDF(s)..."):
+        results = []
+        with ThreadPoolExecutor(max_workers=min(len(to_process), os.cpu_count())) as executor:
+            futures = {executor.submit(parse_and_split, f): f.name for f in to_process}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    st.error(f"Error processing {futures[future]}: {str(e)}")
+
+        # Embed all chunks across all PDFs in one batched call (one large
+        # batch beats N small ones, especially on GPU), then partition the
+        # vectors back into per-PDF vector stores
+        all_chunks = [chunk for _, _, chunks in results for chunk in chunks]
+        if not all_chunks:
+            return
+        all_vectors = embedder.embed_chunks(all_chunks)
+
+        offset = 0
+        for pdf_name, documents, chunks in results:
+            vectors = all_vectors[offset:offset + len(chunks)]
+            offset += len(chunks)
+
+            # Store the documents and add the chunks to the shared index
+            st.session_state.pdf_docs[pdf_name] = documents
+            embedder.add_documents(chunks, vectors)
+
+            # Cache the embedded chunks under the content hash, with the
+            # page documents so cached loads can serve the preview
+            embedder.save_processed_pdf(digests[pdf_name], chunks, vectors, documents)
+
+            st.success(f"Successfully processed {pdf_name}")
+
+        # The shared index was rebuilt; cached chains and prefetched docs
+        # point at the old one
+        st.session_state.chains.clear()
+        st.session_state.retrieval_cache.clear()
+
+# Function to prefetch retrieval results in the background. Summary and
+# notes retrieval (k=10/15) runs as soon as a PDF is selected, so a later
+# button click only pays for the LLM call.
+def prefetch_retrievals(pdf_name):
+    cache = st.session_state.retrieval_cache
+    embedder = st.session_state.embedder
+
+    def worker():
+        for chain_type, k, query in (
+            ("summary", 10, "summarize"),
+            ("notes", 15, "generate notes")
+        ):
+            key = (pdf_name, chain_type)
+            if key not in cache:
+                retriever = embedder.get_retriever(
+                    search_type="centroid", k=k, source=pdf_name
+                )
+                cache[key] = retriever.get_relevant_documents(query)
+
+    threading.Thread(target=worker, daemon=True).start()
 
 # Function to update the preview text
 def update_preview(pdf_name):
@@ -85,86 +187,109 @@ def update_preview(pdf_name):
         st.session_state.preview_text = preview_text
         st.session_state.current_pdf = pdf_name
 
-# Function to process user query
+        # Start retrieval for summary/notes while the user reads the preview
+        prefetch_retrievals(pdf_name)
+
+# Function to get a chain for a PDF, building it at most once per
+# (pdf_name, chain_type) so repeat queries skip chain construction
+def get_chain(pdf_name, chain_type):
+    chain_key = (pdf_name, chain_type)
+
+    if chain_key not in st.session_state.chains:
+        embedder = st.session_state.embedder
+        rag_pipeline = st.session_state.rag_pipeline
+
+        # All PDFs share one index; the retriever filters by source
+        if chain_type == "qa":
+            retriever = embedder.get_retriever(k=5, source=pdf_name)
+            chain = rag_pipeline.create_qa_chain(retriever)
+        elif chain_type == "summary":
+            # Retrieve more chunks for summary; centroid selection is
+            # much cheaper than MMR at large k
+            retriever = embedder.get_retriever(search_type="centroid", k=10, source=pdf_name)
+            chain = rag_pipeline.create_summary_chain(retriever)
+        else:
+            # Retrieve more chunks for comprehensive notes
+            retriever = embedder.get_retriever(search_type="centroid", k=15, source=pdf_name)
+            chain = rag_pipeline.create_notes_chain(retriever)
+
+        st.session_state.chains[chain_key] = chain
+
+    return st.session_state.chains[chain_key]
+
+# Function to process user query. write_stream renders at the call
+# site, so this (and the generators below) must run inside the content
+# column — see the pending_action handling in main()
 def process_query(query, pdf_name):
-    if pdf_name not in st.session_state.vector_stores:
-        return "Please select a PDF first."
-    
+    if pdf_name not in st.session_state.pdf_docs:
+        st.error("Please select a PDF first.")
+        return None
+
     try:
-        # Get the vector store for the selected PDF
-        vector_store = st.session_state.vector_stores[pdf_name]
-        
-        # Create retriever
-        retriever = vector_store.as_retriever(
-            search_type="mmr",
-            search_kwargs={"k": 5}
-        )
-        
-        # Create QA chain
-        qa_chain = st.session_state.rag_pipeline.create_qa_chain(retriever)
-        
-        # Get the answer
-        with st.spinner("Generating answer..."):
-            answer = qa_chain.invoke(query)
-        
+        # Get the QA chain for the selected PDF
+        qa_chain = get_chain(pdf_name, "qa")
+
+        # Stream the answer as tokens arrive; write_stream renders
+        # incrementally and returns the full concatenated text
+        answer = st.write_stream(qa_chain.stream(query))
+
         return answer
-    
+
     except Exception as e:
-        return f"Error processing query: {str(e)}"
+        st.error(f"Error processing query: {str(e)}")
+        return None
 
 # Function to generate summary
 def generate_summary(pdf_name):
-    if pdf_name not in st.session_state.vector_stores:
-        return "Please select a PDF first."
-    
+    if pdf_name not in st.session_state.pdf_docs:
+        st.error("Please select a PDF first.")
+        return None
+
     try:
-        # Get the vector store for the selected PDF
-        vector_store = st.session_state.vector_stores[pdf_name]
-        
-        # Create retriever
-        retriever = vector_store.as_retriever(
-            search_type="mmr",
-            search_kwargs={"k": 10}  # Retrieve more chunks for summary
-        )
-        
-        # Create summary chain
-        summary_chain = st.session_state.rag_pipeline.create_summary_chain(retriever)
-        
-        # Get the summary
-        with st.spinner("Generating summary..."):
-            summary = summary_chain.invoke({"query": "summarize"})
-        
+        # Use prefetched retrieval results when available so only the
+        # LLM call remains; otherwise fall back to the cached chain
+        cached_docs = st.session_state.retrieval_cache.get((pdf_name, "summary"))
+        if cached_docs is not None:
+            summary_chain = st.session_state.rag_pipeline.create_summary_chain(
+                RunnableLambda(lambda _: cached_docs)
+            )
+        else:
+            summary_chain = get_chain(pdf_name, "summary")
+
+        # Stream the summary as tokens arrive
+        summary = st.write_stream(summary_chain.stream({"query": "summarize"}))
+
         return summary
-    
+
     except Exception as e:
-        return f"Error generating summary: {str(e)}"
+        st.error(f"Error generating summary: {str(e)}")
+        return None
 
 # Function to generate study notes
 def generate_notes(pdf_name):
-    if pdf_name not in st.session_state.vector_stores:
-        return "Please select a PDF first."
-    
+    if pdf_name not in st.session_state.pdf_docs:
+        st.error("Please select a PDF first.")
+        return None
+
     try:
-        # Get the vector store for the selected PDF
-        vector_store = st.session_state.vector_stores[pdf_name]
-        
-        # Create retriever
-        retriever = vector_store.as_retriever(
-            search_type="mmr",
-            search_kwargs={"k": 15}  # Retrieve more chunks for comprehensive notes
-        )
-        
-        # Create notes chain
-        notes_chain = st.session_state.rag_pipeline.create_notes_chain(retriever)
-        
-        # Get the notes
-        with st.spinner("Generating study notes..."):
-            notes = notes_chain.invoke({"query": "generate notes"})
-        
+        # Use prefetched retrieval results when available so only the
+        # LLM call remains; otherwise fall back to the cached chain
+        cached_docs = st.session_state.retrieval_cache.get((pdf_name, "notes"))
+        if cached_docs is not None:
+            notes_chain = st.session_state.rag_pipeline.create_notes_chain(
+                RunnableLambda(lambda _: cached_docs)
+            )
+        else:
+            notes_chain = get_chain(pdf_name, "notes")
+
+        # Stream the notes as tokens arrive
+        notes = st.write_stream(notes_chain.stream({"query": "generate notes"}))
+
         return notes
-    
+
     except Exception as e:
-        return f"Error generating notes: {str(e)}"
+        st.error(f"Error generating notes: {str(e)}")
+        return None
 
 # Main application
 def main():
@@ -209,17 +334,17 @@ def main():
             
             col1, col2 = st.columns(2)
             
+            # Buttons only record what to generate; the generation runs
+            # inside the content column so the stream renders there
             with col1:
                 if st.button("Generate Summary"):
                     if st.session_state.current_pdf:
-                        st.session_state.generated_content = generate_summary(st.session_state.current_pdf)
-                        st.session_state.content_type = "summary"
-            
+                        st.session_state.pending_action = ("summary", st.session_state.current_pdf, None)
+
             with col2:
                 if st.button("Create Study Notes"):
                     if st.session_state.current_pdf:
-                        st.session_state.generated_content = generate_notes(st.session_state.current_pdf)
-                        st.session_state.content_type = "notes"
+                        st.session_state.pending_action = ("notes", st.session_state.current_pdf, None)
     
     # Main content area
     col1, col2 = st.columns([1, 1])
@@ -253,29 +378,49 @@ def main():
                 st.warning("Please select a PDF first")
             else:
                 if query.lower().strip() in ["summarize this", "summarize", "summary"]:
-                    st.session_state.generated_content = generate_summary(st.session_state.current_pdf)
-                    st.session_state.content_type = "summary"
+                    st.session_state.pending_action = ("summary", st.session_state.current_pdf, None)
                 else:
-                    st.session_state.generated_content = process_query(query, st.session_state.current_pdf)
-                    st.session_state.content_type = "answer"
+                    st.session_state.pending_action = ("answer", st.session_state.current_pdf, query)
     
     # Right column: Generated content
     with col2:
         st.header("Generated Content")
-        
-        if "generated_content" in st.session_state and "content_type" in st.session_state:
+
+        content_titles = {
+            "summary": "📝 Summary",
+            "notes": "📒 Study Notes",
+            "answer": "🔍 Answer"
+        }
+
+        pending = st.session_state.pop("pending_action", None)
+        if pending is not None:
+            # Run the generation here so write_stream streams into this
+            # column rather than wherever the triggering button lives
+            content_type, pdf_name, query = pending
+            st.markdown(f"### {content_titles.get(content_type, 'Generated Content')}")
+
+            if content_type == "summary":
+                content = generate_summary(pdf_name)
+            elif content_type == "notes":
+                content = generate_notes(pdf_name)
+            else:
+                content = process_query(query, pdf_name)
+
+            if content is not None:
+                st.session_state.generated_content = content
+                st.session_state.content_type = content_type
+
+        elif "generated_content" in st.session_state and "content_type" in st.session_state:
             content_type = st.session_state.content_type
             content = st.session_state.generated_content
-            
-            content_title = {
-                "summary": "📝 Summary",
-                "notes": "📒 Study Notes",
-                "answer": "🔍 Answer"
-            }.get(content_type, "Generated Content")
-            
-            st.markdown(f"### {content_title}")
+
+            st.markdown(f"### {content_titles.get(content_type, 'Generated Content')}")
             st.markdown(content)
-            
+
+        if "generated_content" in st.session_state and "content_type" in st.session_state:
+            content_type = st.session_state.content_type
+            content = st.session_state.generated_content
+
             # Download button
             file_extension = "md" if content_type in ["summary", "notes"] else "txt"
             filename = f"{st.session_state.current_pdf.split('.')[0]}_{content_type}.{file_extension}"
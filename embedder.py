@@ -1,139 +1,637 @@
-# embedder.py
-# This module handles text embedding and vector storage
-
-import os
-from typing import List, Dict, Any, Optional
-import pickle
-
-from langchain_core.documents import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS, Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-
-
-class DocumentEmbedder:
-    """Handles document chunking, embedding, and vector storage"""
-    
-    def __init__(self, 
-                 embedding_model_name: str = "all-MiniLM-L6-v2",
-                 chunk_size: int = 1000,
-                 chunk_overlap: int = 200,
-                 vector_store_type: str = "faiss"):
-        """
-        Initialize the document embedder
-        
-        Args:
-            embedding_model_name: Name of the HuggingFace embedding model to use
-            chunk_size: Size of text chunks for splitting documents
-            chunk_overlap: Overlap between text chunks
-            vector_store_type: Type of vector store ("faiss" or "chroma")
-        """
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len
-        )
-        
-        # Initialize the embedding model
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model_name)
-        self.vector_store_type = vector_store_type
-        self.vector_store = None
-        
-        # Create directory for storing embeddings
-        os.makedirs("embeddings", exist_ok=True)
-    
-    def process_documents(self, documents: List[Document]) -> List[Document]:
-        """
-        Split documents into smaller chunks
-        
-        Args:
-            documents: List of Document objects
-            
-        Returns:
-            List of Document chunks
-        """
-        return self.text_splitter.split_documents(documents)
-    
-    def create_vector_store(self, documents: List[Document]) -> Any:
-        """
-        Create and return a vector store from documents
-        
-        Args:
-            documents: List of Document objects (chunks)
-            
-        Returns:
-            Vector store object (FAISS or Chroma)
-        """
-        # Split documents into chunks if they haven't been split already
-        chunks = self.process_documents(documents)
-        
-        # Create vector store
-        if self.vector_store_type.lower() == "faiss":
-            self.vector_store = FAISS.from_documents(chunks, self.embeddings)
-        elif self.vector_store_type.lower() == "chroma":
-            self.vector_store = Chroma.from_documents(chunks, self.embeddings)
-        else:
-            raise ValueError(f"Unsupported vector store type: {self.vector_store_type}")
-        
-        return self.vector_store
-    
-    def save_vector_store(self, pdf_name: str) -> None:
-        """
-        Save the vector store to disk
-        
-        Args:
-            pdf_name: Name of the PDF file (for creating filename)
-        """
-        if self.vector_store is None:
-            raise ValueError("No vector store available to save")
-        
-        # Create a safe filename
-        safe_name = "".join(c if c.isalnum() else "_" for c in pdf_name)
-        save_path = os.path.join("embeddings", safe_name)
-        
-        if self.vector_store_type.lower() == "faiss":
-            self.vector_store.save_local(save_path)
-        elif self.vector_store_type.lower() == "chroma":
-            # For Chroma, we need to use the persist method
-            # This is just a placeholder as the actual implementation depends on specific use case
-            pass
-    
-    def load_vector_store(self, pdf_name: str) -> Optional[Any]:
-        """
-        Load a vector store from disk
-        
-        Args:
-            pdf_name: Name of the PDF file
-            
-        Returns:
-            Vector store object or None if not found
-        """
-        # Create a safe filename
-        safe_name = "".join(c if c.isalnum() else "_" for c in pdf_name)
-        load_path = os.path.join("embeddings", safe_name)
-        
-        if os.path.exists(load_path):
-            if self.vector_store_type.lower() == "faiss":
-                self.vector_store = FAISS.load_local(load_path, self.embeddings)
-                return self.vector_store
-        
-        return None
-    
-    def get_retriever(self, search_type: str = "mmr", k: int = 5):
-        """
-        Create a retriever from the vector store
-        
-        Args:
-            search_type: Type of search to perform ("mmr" or "similarity")
-            k: Number of documents to retrieve
-            
-        Returns:
-            Retriever object
-        """
-        if self.vector_store is None:
-            raise ValueError("No vector store available for retrieval")
-        
-        return self.vector_store.as_retriever(
-            search_type=search_type,
-            search_kwargs={"k": k}
+# embedder.py
+# This module handles text embedding and vector storage
+
+import os
+import math
+import uuid
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+import pickle
+
+import faiss
+import numpy as np
+import torch
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+
+# The langchain / langchain_community packages (and the embedding model
+# itself) are imported lazily inside the methods that need them, so
+# importing this module stays cheap and a cold app start renders the UI
+# before any model weights are touched
+
+# Use all cores for FAISS search and k-means kernels. The faiss-cpu
+# >= 1.8 wheels ship AVX2/AVX-512 variants and load the widest one the
+# CPU supports, roughly doubling flat-index search throughput.
+faiss.omp_set_num_threads(os.cpu_count())
+
+if hasattr(faiss, "supported_instruction_sets") and \
+        "AVX2" not in faiss.supported_instruction_sets():
+    print("Warning: this FAISS build lacks AVX2; vector search will be slower")
+
+# Chunk count above which we switch from an exact flat index to IVFPQ.
+# Below this, a linear scan is fast enough and exact results are preferred.
+IVFPQ_THRESHOLD = 4096
+
+# Product quantization parameters: 384-d MiniLM vectors split into 64
+# sub-vectors of 6 dims each, 8 bits per code (~32x smaller than FP32)
+PQ_NUM_SUBQUANTIZERS = 64
+PQ_BITS_PER_CODE = 8
+
+# How many Hamming candidates to fetch per requested result before the
+# FP32 rescoring pass
+BINARY_OVERSAMPLE = 4
+
+# Near-duplicate filtering: chunks whose 64-bit SimHash is within this
+# Hamming distance of an already-kept chunk are dropped before indexing
+SIMHASH_BITS = 64
+SIMHASH_MAX_DISTANCE = 4
+
+# Fixed random hyperplanes for SimHash, one matrix per embedding dim
+_simhash_planes: Dict[int, np.ndarray] = {}
+
+
+def _binarize(vectors: np.ndarray) -> np.ndarray:
+    """Quantize FP32 vectors to packed sign bits (1 bit per dimension)"""
+    return np.packbits(vectors > 0, axis=-1)
+
+
+def _simhash(vectors: np.ndarray) -> np.ndarray:
+    """
+    64-bit SimHash of each vector: sign bits of projections onto fixed
+    random hyperplanes, packed to 8 bytes per row
+    """
+    dim = vectors.shape[1]
+    planes = _simhash_planes.get(dim)
+    if planes is None:
+        planes = np.random.default_rng(0).standard_normal(
+            (dim, SIMHASH_BITS)
+        ).astype(np.float32)
+        _simhash_planes[dim] = planes
+
+    return np.packbits(vectors @ planes > 0, axis=-1)
+
+
+class BinaryRescoreRetriever(BaseRetriever):
+    """
+    Retriever that searches a binary (sign-quantized) index by Hamming
+    distance, then rescores the candidate pool with the full FP32 vectors
+
+    The binary scan uses popcount-based Hamming distance, which is ~32x
+    cheaper than FP32 comparisons; rescoring the small candidate pool in
+    float recovers most of the lost accuracy. The final top-k is picked
+    greedily with a minimum pairwise Hamming distance so results stay
+    diverse (replacing MMR's O(k^2) float re-ranking).
+    """
+
+    embeddings: Any
+    binary_index: Any
+    doc_vectors: Any
+    chunks: List[Document]
+    k: int = 5
+    min_hamming: int = 8
+    source: Optional[str] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        query_codes = _binarize(query_vector[np.newaxis, :])
+
+        # Hamming search over the binary index for an oversampled pool;
+        # oversample harder when a source filter will thin the candidates
+        pool_size = self.k * BINARY_OVERSAMPLE
+        if self.source is not None:
+            pool_size *= 4
+        pool_size = min(pool_size, self.binary_index.ntotal)
+        _, candidate_ids = self.binary_index.search(query_codes, pool_size)
+        candidate_ids = [i for i in candidate_ids[0] if i != -1]
+
+        if self.source is not None:
+            candidate_ids = [
+                i for i in candidate_ids
+                if self.chunks[i].metadata.get("source") == self.source
+            ]
+            if not candidate_ids:
+                return []
+
+        # Rescore candidates with the full FP32 vectors
+        scores = self.doc_vectors[candidate_ids] @ query_vector
+        ranked = [candidate_ids[i] for i in np.argsort(-scores)]
+
+        # Greedy diverse-by-Hamming selection of the final top-k
+        codes = np.unpackbits(_binarize(self.doc_vectors[ranked]), axis=-1)
+        selected = []
+        for position in range(len(ranked)):
+            if len(selected) >= self.k:
+                break
+            if selected:
+                distances = np.count_nonzero(codes[selected] != codes[position], axis=-1)
+                if distances.min() < self.min_hamming:
+                    continue
+            selected.append(position)
+
+        # Backfill from the ranking if diversity filtering was too strict
+        for position in range(len(ranked)):
+            if len(selected) >= self.k:
+                break
+            if position not in selected:
+                selected.append(position)
+
+        return [self.chunks[ranked[position]] for position in selected]
+
+
+class CentroidDiversityRetriever(BaseRetriever):
+    """
+    Retriever that picks diverse results by clustering a similarity pool
+
+    Fetches 4*k candidates by FP32 similarity, runs a few iterations of
+    FAISS k-means over their vectors, and returns the candidate nearest
+    each centroid. That is O(fetch_k * k * niter) in SIMD k-means kernels
+    versus MMR's O(fetch_k^2) Python-side re-ranking, with comparable
+    diversity — it matters for the large-k summary and notes retrievals.
+    """
+
+    embeddings: Any
+    doc_vectors: Any
+    chunks: List[Document]
+    k: int = 10
+    source: Optional[str] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        query_vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+
+        # Candidate ids, restricted to one PDF when a source is set
+        if self.source is not None:
+            candidate_ids = np.array([
+                i for i, chunk in enumerate(self.chunks)
+                if chunk.metadata.get("source") == self.source
+            ], dtype=np.int64)
+        else:
+            candidate_ids = np.arange(len(self.chunks))
+
+        if candidate_ids.size == 0:
+            return []
+
+        # Similarity pool of 4*k candidates
+        scores = self.doc_vectors[candidate_ids] @ query_vector
+        fetch_k = min(4 * self.k, candidate_ids.size)
+        pool_ids = candidate_ids[np.argpartition(-scores, fetch_k - 1)[:fetch_k]]
+
+        if pool_ids.size <= self.k:
+            order = np.argsort(-(self.doc_vectors[pool_ids] @ query_vector))
+            return [self.chunks[i] for i in pool_ids[order]]
+
+        # Cluster the pool and keep the candidate nearest each centroid
+        pool_vectors = self.doc_vectors[pool_ids]
+        kmeans = faiss.Kmeans(pool_vectors.shape[1], self.k, niter=5, verbose=False)
+        kmeans.train(pool_vectors)
+
+        pool_index = faiss.IndexFlatL2(pool_vectors.shape[1])
+        pool_index.add(pool_vectors)
+        _, nearest = pool_index.search(kmeans.centroids, 1)
+
+        # Two centroids can pick the same candidate, so backfill from the
+        # similarity ranking up to k and return in relevance order
+        pool_scores = pool_vectors @ query_vector
+        ranking = np.argsort(-pool_scores)
+
+        selected = {int(position) for position in nearest[:, 0]}
+        for position in ranking:
+            if len(selected) >= self.k:
+                break
+            selected.add(int(position))
+
+        ordered = [position for position in ranking if position in selected]
+        return [self.chunks[pool_ids[position]] for position in ordered[:self.k]]
+
+
+class DocumentEmbedder:
+    """Handles document chunking, embedding, and vector storage"""
+    
+    def __init__(self,
+                 embedding_model_name: str = "all-MiniLM-L6-v2",
+                 chunk_size: int = 256,
+                 chunk_overlap: int = 32,
+                 vector_store_type: str = "faiss"):
+        """
+        Initialize the document embedder
+
+        Args:
+            embedding_model_name: Name of the HuggingFace embedding model to use
+            chunk_size: Size of text chunks for splitting documents, in tokens
+            chunk_overlap: Overlap between text chunks, in tokens
+            vector_store_type: Type of vector store ("faiss" or "chroma")
+        """
+        # The embedding model and splitter are built lazily (see the
+        # embeddings / text_splitter properties): constructing the
+        # embedder is free, and the model-load cost is only paid when the
+        # first PDF is actually processed
+        self.embedding_model_name = embedding_model_name
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._embeddings = None
+        self._text_splitter = None
+        # Uploads split/embed from worker threads, so first access to the
+        # lazy properties can race; the lock keeps the model from being
+        # loaded twice
+        self._init_lock = threading.Lock()
+
+        self.vector_store_type = vector_store_type
+        self.vector_store = None
+
+        # Number of IVF cells probed at query time (only used for IVFPQ
+        # indices); raise for better recall, lower for faster queries
+        self.nprobe = 8
+
+        # Shared corpus state: every PDF's chunks live in one index, with
+        # chunk metadata carrying the source PDF for filtered retrieval.
+        # The binary sidecar (packed sign-bit index) and the FP32 vectors
+        # kept for rescoring stay aligned with the chunk list.
+        self._binary_index = None
+        self._doc_vectors = None
+        self._chunks = []
+
+        # Create directory for storing embeddings
+        os.makedirs("embeddings", exist_ok=True)
+
+    @property
+    def embeddings(self):
+        """Embedding model, loaded on first use (thread-safe)"""
+        if self._embeddings is None:
+            with self._init_lock:
+                if self._embeddings is None:
+                    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+                    # Initialize the embedding model with explicit batching
+                    # and device pinning; the sentence-transformers defaults
+                    # encode one small batch at a time on whatever device it
+                    # guesses
+                    device = "cuda" if torch.cuda.is_available() else "cpu"
+                    embeddings = HuggingFaceEmbeddings(
+                        model_name=self.embedding_model_name,
+                        model_kwargs={"device": device},
+                        encode_kwargs={
+                            "batch_size": 64,
+                            "normalize_embeddings": True,
+                            "convert_to_numpy": True
+                        }
+                    )
+
+                    # Half precision on GPU so matmuls run on tensor cores
+                    if device == "cuda":
+                        embeddings.client.half()
+
+                    self._embeddings = embeddings
+
+        return self._embeddings
+
+    @property
+    def text_splitter(self):
+        """Token-based text splitter, built on first use (thread-safe)"""
+        if self._text_splitter is None:
+            # Touch the embeddings property before taking the lock — it
+            # acquires the same (non-reentrant) lock for its own lazy load
+            tokenizer = self.embeddings.client.tokenizer
+
+            with self._init_lock:
+                if self._text_splitter is None:
+                    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+                    # Split by token count using the embedding model's own
+                    # (already loaded) fast tokenizer: one tokenizer pass
+                    # per document instead of char-based Python recursion,
+                    # and chunks sized to the model's context window rather
+                    # than an arbitrary character budget
+                    self._text_splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+                        tokenizer,
+                        chunk_size=self.chunk_size,
+                        chunk_overlap=self.chunk_overlap
+                    )
+
+        return self._text_splitter
+
+    def process_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        Split documents into smaller chunks
+        
+        Args:
+            documents: List of Document objects
+            
+        Returns:
+            List of Document chunks
+        """
+        return self.text_splitter.split_documents(documents)
+    
+    def create_vector_store(self, documents: List[Document],
+                            precomputed_embeddings: Optional[np.ndarray] = None) -> Any:
+        """
+        Add documents to the shared vector store and return it
+
+        Args:
+            documents: List of Document objects (chunks)
+            precomputed_embeddings: FP32 embedding matrix aligned with
+                documents; when given, documents must already be chunks
+                (they are not re-split) and no embedding pass runs
+
+        Returns:
+            Vector store object (FAISS or Chroma)
+        """
+        if precomputed_embeddings is not None:
+            return self.add_documents(documents, precomputed_embeddings)
+
+        # Split documents into chunks if they haven't been split already
+        chunks = self.process_documents(documents)
+
+        # Create vector store
+        if self.vector_store_type.lower() == "faiss":
+            self.add_documents(chunks, self.embed_chunks(chunks))
+        elif self.vector_store_type.lower() == "chroma":
+            from langchain_community.vectorstores import Chroma
+            self.vector_store = Chroma.from_documents(chunks, self.embeddings)
+        else:
+            raise ValueError(f"Unsupported vector store type: {self.vector_store_type}")
+
+        return self.vector_store
+
+    def embed_chunks(self, chunks: List[Document]) -> np.ndarray:
+        """
+        Embed chunk texts in a single batched call
+
+        Args:
+            chunks: List of Document chunks
+
+        Returns:
+            FP32 embedding matrix, one row per chunk
+        """
+        return np.asarray(
+            self.embeddings.embed_documents([chunk.page_content for chunk in chunks]),
+            dtype=np.float32
+        )
+
+    def add_documents(self, chunks: List[Document], vectors: np.ndarray) -> Any:
+        """
+        Add pre-embedded chunks to the shared vector store
+
+        All PDFs share one index; chunk metadata carries the source PDF
+        so retrieval can filter per PDF (or search across all of them).
+        The index is rebuilt from the combined vector pool, which also
+        lets IVFPQ train its centroids on the whole corpus.
+
+        Args:
+            chunks: List of Document chunks (metadata must include "source")
+            vectors: FP32 embedding matrix, one row per chunk
+
+        Returns:
+            The shared FAISS vector store
+        """
+        chunks, vectors = self._dedup_chunks(list(chunks), vectors)
+        if not chunks:
+            return self.vector_store
+
+        if self._doc_vectors is None:
+            all_chunks = list(chunks)
+            all_vectors = vectors
+        else:
+            all_chunks = self._chunks + list(chunks)
+            all_vectors = np.vstack([self._doc_vectors, vectors])
+
+        self.vector_store = self._build_faiss_store(all_chunks, all_vectors)
+        self._build_binary_sidecar(all_chunks, all_vectors)
+        return self.vector_store
+
+    def _dedup_chunks(self, chunks: List[Document],
+                      vectors: np.ndarray) -> Tuple[List[Document], np.ndarray]:
+        """
+        Drop near-duplicate chunks before they reach the index
+
+        Repeating headers, footers and boilerplate turn into near-identical
+        chunks that bloat the index and skew retrieval. A chunk whose
+        SimHash lies within SIMHASH_MAX_DISTANCE (Hamming) of any kept
+        chunk from the SAME source — in this batch or the existing corpus
+        — is discarded. Dedup is scoped per source deliberately: retrievers
+        filter by source, so dropping a chunk because another PDF already
+        holds near-identical text would leave the filtered view with holes
+        (a re-uploaded PDF under a new name would index zero chunks).
+
+        Args:
+            chunks: List of Document chunks
+            vectors: FP32 embedding matrix, one row per chunk
+
+        Returns:
+            Tuple of (kept chunks, kept vectors)
+        """
+        hashes = _simhash(vectors)
+
+        kept_by_source: Dict[Any, List[np.ndarray]] = {}
+        if self._doc_vectors is not None and len(self._doc_vectors):
+            for chunk, chunk_hash in zip(self._chunks, _simhash(self._doc_vectors)):
+                kept_by_source.setdefault(chunk.metadata.get("source"), []).append(chunk_hash)
+
+        keep = []
+        for i in range(len(chunks)):
+            kept_hashes = kept_by_source.setdefault(chunks[i].metadata.get("source"), [])
+            if kept_hashes:
+                diffs = np.bitwise_xor(np.asarray(kept_hashes), hashes[i])
+                if np.unpackbits(diffs, axis=-1).sum(axis=-1).min() <= SIMHASH_MAX_DISTANCE:
+                    continue
+            keep.append(i)
+            kept_hashes.append(hashes[i])
+
+        if len(keep) == len(chunks):
+            return chunks, vectors
+
+        return [chunks[i] for i in keep], vectors[keep]
+
+    def _build_faiss_store(self, chunks: List[Document], vectors: np.ndarray) -> Any:
+        """
+        Build a FAISS vector store from pre-embedded chunks
+
+        Small corpora get an exact IndexFlatL2; large ones get an IVFPQ
+        index (coarse quantizer + product quantization), which stores 8-bit
+        PQ codes instead of FP32 vectors and searches sublinearly.
+
+        Args:
+            chunks: List of Document chunks
+            vectors: FP32 embedding matrix, one row per chunk
+
+        Returns:
+            FAISS vector store wrapping the raw index
+        """
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+
+        num_vectors, dim = vectors.shape
+
+        if num_vectors < IVFPQ_THRESHOLD:
+            # Flat (exact) index: let LangChain assemble the store from
+            # the vectors we already have — no second embedding pass
+            return FAISS.from_embeddings(
+                text_embeddings=zip(
+                    [chunk.page_content for chunk in chunks], vectors
+                ),
+                embedding=self.embeddings,
+                metadatas=[chunk.metadata for chunk in chunks]
+            )
+
+        # nlist ~ sqrt(N) per the FAISS guidelines, capped so each
+        # cell has enough training points
+        nlist = max(1, min(int(math.sqrt(num_vectors)), num_vectors // 39))
+        quantizer = faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFPQ(
+            quantizer, dim, nlist,
+            PQ_NUM_SUBQUANTIZERS, PQ_BITS_PER_CODE
+        )
+        index.train(vectors)
+        index.nprobe = self.nprobe
+        index.add(vectors)
+
+        # Wrap the raw index in LangChain's FAISS store
+        ids = [str(uuid.uuid4()) for _ in chunks]
+        docstore = InMemoryDocstore(dict(zip(ids, chunks)))
+        index_to_docstore_id = dict(enumerate(ids))
+
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id
+        )
+
+    def _build_binary_sidecar(self, chunks: List[Document], vectors: np.ndarray) -> None:
+        """
+        Build the binary (sign-quantized) index used for Hamming retrieval
+
+        Args:
+            chunks: List of Document chunks
+            vectors: FP32 embedding matrix, one row per chunk
+        """
+        self._binary_index = faiss.IndexBinaryFlat(vectors.shape[1])
+        self._binary_index.add(_binarize(vectors))
+        self._doc_vectors = vectors
+        self._chunks = list(chunks)
+
+    def save_processed_pdf(self,
+                           pdf_name: str,
+                           chunks: List[Document],
+                           vectors: np.ndarray,
+                           documents: List[Document]) -> None:
+        """
+        Persist a PDF's embedded chunks and page documents to disk
+
+        The shared index itself is not saved; it is rebuilt cheaply from
+        the cached vectors when PDFs are loaded back.
+
+        Args:
+            pdf_name: Name of the PDF file (for creating filename)
+            chunks: The PDF's Document chunks
+            vectors: FP32 embedding matrix, one row per chunk
+            documents: Page-level documents, so previews work without
+                reparsing the PDF
+        """
+        # Create a safe filename
+        safe_name = "".join(c if c.isalnum() else "_" for c in pdf_name)
+        save_path = os.path.join("embeddings", safe_name)
+        os.makedirs(save_path, exist_ok=True)
+
+        np.save(os.path.join(save_path, "vectors.npy"), vectors)
+        with open(os.path.join(save_path, "chunks.pkl"), "wb") as f:
+            pickle.dump(chunks, f)
+        with open(os.path.join(save_path, "documents.pkl"), "wb") as f:
+            pickle.dump(documents, f)
+
+    def load_processed_pdf(self, pdf_name: str,
+                           source: Optional[str] = None) -> Optional[List[Document]]:
+        """
+        Load a PDF's cached chunks from disk into the shared vector store
+
+        Args:
+            pdf_name: Name of the PDF file (or content digest) used at save time
+            source: Current display name of the PDF; when the cache key is
+                a content digest, the same bytes may be re-uploaded under a
+                new name, so chunk metadata is rewritten to match
+
+        Returns:
+            The PDF's page-level documents, or None if not cached
+        """
+        # Create a safe filename
+        safe_name = "".join(c if c.isalnum() else "_" for c in pdf_name)
+        load_path = os.path.join("embeddings", safe_name)
+
+        if not os.path.exists(os.path.join(load_path, "chunks.pkl")):
+            return None
+
+        vectors = np.load(os.path.join(load_path, "vectors.npy"))
+        with open(os.path.join(load_path, "chunks.pkl"), "rb") as f:
+            chunks = pickle.load(f)
+        with open(os.path.join(load_path, "documents.pkl"), "rb") as f:
+            documents = pickle.load(f)
+
+        if source is not None:
+            for doc in chunks + documents:
+                doc.metadata["source"] = source
+
+        self.add_documents(chunks, vectors)
+        return documents
+
+    def get_retriever(self, search_type: str = "mmr", k: int = 5,
+                      source: Optional[str] = None):
+        """
+        Create a retriever from the shared vector store
+
+        Args:
+            search_type: Type of search to perform ("mmr", "similarity"
+                or "centroid"); "mmr" routes to the binary index when
+                available, using diverse-by-Hamming selection instead of
+                float MMR, and "centroid" selects diverse results by
+                k-means clustering of a similarity pool (preferred for
+                large k)
+            k: Number of documents to retrieve
+            source: Restrict results to chunks of this PDF; None searches
+                across all loaded PDFs
+
+        Returns:
+            Retriever object
+        """
+        if self.vector_store is None:
+            raise ValueError("No vector store available for retrieval")
+
+        if search_type == "centroid":
+            return CentroidDiversityRetriever(
+                embeddings=self.embeddings,
+                doc_vectors=self._doc_vectors,
+                chunks=self._chunks,
+                k=k,
+                source=source
+            )
+
+        # Route diversity-seeking retrieval through the binary index:
+        # Hamming candidate search plus FP32 rescoring is far cheaper than
+        # MMR's float re-ranking at the same quality
+        if self._binary_index is not None and search_type == "mmr":
+            return BinaryRescoreRetriever(
+                embeddings=self.embeddings,
+                binary_index=self._binary_index,
+                doc_vectors=self._doc_vectors,
+                chunks=self._chunks,
+                k=k,
+                source=source
+            )
+
+        search_kwargs = {"k": k}
+        if source is not None:
+            search_kwargs["filter"] = {"source": source}
+
+        return self.vector_store.as_retriever(
+            search_type=search_type,
+            search_kwargs=search_kwargs
         )
\ No newline at end of file
@@ -1,146 +1,199 @@
-# rag_pipeline.py
-# This module handles the RAG pipeline for query processing and generation
-
-import os
-from typing import List, Dict, Any
-
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
-from langchain_groq import ChatGroq
-
-
-class RAGPipeline:
-    """Handles the RAG pipeline for query processing and generation"""
-    
-    def __init__(self, groq_api_key: str, model_name: str = "llama3-70b-8192"):
-        """
-        Initialize the RAG pipeline
-        
-        Args:
-            groq_api_key: API key for the GROQ API
-            model_name: Name of the GROQ model to use
-        """
-        # Set the API key
-        os.environ["GROQ_API_KEY"] = groq_api_key
-        
-        # Initialize the LLM
-        self.llm = ChatGroq(
-            model=model_name,
-            temperature=0.2
-        )
-    
-    def create_qa_chain(self, retriever):
-        """
-        Create a question-answering chain
-        
-        Args:
-            retriever: Retriever object from the vector store
-            
-        Returns:
-            QA chain that can be invoked with a question
-        """
-        # Define the prompt template
-        qa_prompt = ChatPromptTemplate.from_template(
-            """You are a helpful academic assistant that answers questions based on the provided context.
-            
-            Context:
-            {context}
-            
-            Question: {question}
-            
-            Instructions:
-            - Answer the question based only on the provided context
-            - If the context doesn't contain the answer, say "I don't have enough information to answer this question."
-            - Be concise and accurate
-            - Use specific examples from the context when appropriate
-            - Cite the page number when referencing specific information (e.g., "According to page 3...")
-            
-            Answer:"""
-        )
-        
-        # Create the chain
-        qa_chain = (
-            {"context": retriever, "question": RunnablePassthrough()}
-            | qa_prompt
-            | self.llm
-            | StrOutputParser()
-        )
-        
-        return qa_chain
-    
-    def create_summary_chain(self, retriever):
-        """
-        Create a summarization chain
-        
-        Args:
-            retriever: Retriever object from the vector store
-            
-        Returns:
-            Summary chain that can be invoked with a document
-        """
-        # Define the prompt template
-        summary_prompt = ChatPromptTemplate.from_template(
-            """You are an expert at summarizing academic content.
-            
-            Content to summarize:
-            {context}
-            
-            Instructions:
-            - Provide a comprehensive summary of the provided content
-            - Identify and include the key points, main ideas, and essential information
-            - Organize the summary in a logical structure
-            - Keep the summary informative yet concise
-            - Maintain the academic tone of the original content
-            
-            Summary:"""
-        )
-        
-        # Create the chain
-        summary_chain = (
-            {"context": retriever}
-            | summary_prompt
-            | self.llm
-            | StrOutputParser()
-        )
-        
-        return summary_chain
-    
-    def create_notes_chain(self, retriever):
-        """
-        Create a notes generation chain
-        
-        Args:
-            retriever: Retriever object from the vector store
-            
-        Returns:
-            Notes chain that can be invoked with a document
-        """
-        # Define the prompt template
-        notes_prompt = ChatPromptTemplate.from_template(
-            """You are an expert at creating study notes for students.
-            
-            Content to convert to notes:
-            {context}
-            
-            Instructions:
-            - Create comprehensive study notes from the provided content
-            - Structure the notes with clear headings, subheadings, and bullet points
-            - Include all important concepts, definitions, theories, and examples
-            - Organize information hierarchically with main points and supporting details
-            - Format in Markdown with proper headers (##, ###), bullet points, and emphasis
-            - Include any relevant formulas, diagrams descriptions, or key quotations
-            - Add a "Key Takeaways" section at the end
-            
-            Study Notes:"""
-        )
-        
-        # Create the chain
-        notes_chain = (
-            {"context": retriever}
-            | notes_prompt
-            | self.llm
-            | StrOutputParser()
-        )
-        
-        return notes_chain
\ No newline at end of file
+# rag_pipeline.py
+# This module handles the RAG pipeline for query processing and generation
+
+from typing import List, Dict, Any
+
+from langchain_core.globals import set_llm_cache
+from langchain_core.load import dumps
+from langchain_core.outputs import Generation
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableGenerator, RunnablePassthrough
+from langchain_community.cache import SQLiteCache
+from langchain_groq import ChatGroq
+
+# SQLite file backing the LLM response cache
+LLM_CACHE_PATH = ".llm_cache.db"
+
+# Prompt templates are parsed once at import (partial evaluation); chain
+# construction only composes them
+_QA_PROMPT = ChatPromptTemplate.from_template(
+    """You are a helpful academic assistant that answers questions based on the provided context.
+    
+    Context:
+    {context}
+    
+    Question: {question}
+    
+    Instructions:
+    - Answer the question based only on the provided context
+    - If the context doesn't contain the answer, say "I don't have enough information to answer this question."
+    - Be concise and accurate
+    - Use specific examples from the context when appropriate
+    - Cite the page number when referencing specific information (e.g., "According to page 3...")
+    
+    Answer:"""
+)
+
+_SUMMARY_PROMPT = ChatPromptTemplate.from_template(
+    """You are an expert at summarizing academic content.
+    
+    Content to summarize:
+    {context}
+    
+    Instructions:
+    - Provide a comprehensive summary of the provided content
+    - Identify and include the key points, main ideas, and essential information
+    - Organize the summary in a logical structure
+    - Keep the summary informative yet concise
+    - Maintain the academic tone of the original content
+    
+    Summary:"""
+)
+
+_NOTES_PROMPT = ChatPromptTemplate.from_template(
+    """You are an expert at creating study notes for students.
+    
+    Content to convert to notes:
+    {context}
+    
+    Instructions:
+    - Create comprehensive study notes from the provided content
+    - Structure the notes with clear headings, subheadings, and bullet points
+    - Include all important concepts, definitions, theories, and examples
+    - Organize information hierarchically with main points and supporting details
+    - Format in Markdown with proper headers (##, ###), bullet points, and emphasis
+    - Include any relevant formulas, diagrams descriptions, or key quotations
+    - Add a "Key Takeaways" section at the end
+    
+    Study Notes:"""
+)
+
+
+class RAGPipeline:
+    """Handles the RAG pipeline for query processing and generation"""
+    
+    def __init__(self,
+                 groq_api_key: str,
+                 model_name: str = "llama3-70b-8192",
+                 fast_model_name: str = "llama-3.1-8b-instant"):
+        """
+        Initialize the RAG pipeline
+
+        Args:
+            groq_api_key: API key for the GROQ API
+            model_name: Name of the strong GROQ model (notes generation)
+            fast_model_name: Name of the fast GROQ model (QA and summaries)
+        """
+        # Cache LLM responses on disk: repeat questions, regenerated
+        # summaries and notes hit the cache instead of calling Groq. The
+        # cache key includes model and full prompt (context included), so
+        # identical retrievals short-circuit entirely.
+        # BaseChatModel.stream() never consults the global cache in this
+        # langchain-core version, so the streaming chains go through
+        # _stream_through_cache below; the global hook still covers any
+        # invoke()-style use of the LLMs
+        self._llm_cache = SQLiteCache(database_path=LLM_CACHE_PATH)
+        set_llm_cache(self._llm_cache)
+
+        # Two LLMs; streaming lets the UI render tokens as they arrive
+        # instead of blocking on the full response. Context-grounded QA
+        # and summaries don't need the large model, so they run on the
+        # fast one; notes generation keeps the strong model
+        # The key is passed straight to the clients rather than through
+        # os.environ: process-wide env mutation is unsafe once the
+        # pipeline is shared across sessions via st.cache_resource
+        self.fast_llm = ChatGroq(
+            api_key=groq_api_key,
+            model=fast_model_name,
+            temperature=0.2,
+            streaming=True
+        )
+        self.strong_llm = ChatGroq(
+            api_key=groq_api_key,
+            model=model_name,
+            temperature=0.2,
+            streaming=True
+        )
+
+    def _stream_through_cache(self, llm):
+        """
+        Wrap an LLM as a runnable whose streamed output goes through the
+        response cache
+
+        Cache handling lives in the invoke/generate path of chat models,
+        so plain .stream() calls would never hit or populate the cache.
+        This checks the cache on the rendered prompt first, replays hits
+        as a stream without calling Groq, and writes misses back once
+        the live stream completes.
+        """
+        def generate(prompt_values):
+            prompt_value = next(iter(prompt_values))
+
+            # Key the entry the same way the invoke path does, so both
+            # paths share one cache
+            prompt_key = dumps(prompt_value.to_messages())
+            llm_string = llm._get_llm_string()
+
+            cached = self._llm_cache.lookup(prompt_key, llm_string)
+            if cached:
+                yield cached[0].text
+                return
+
+            pieces = []
+            for chunk in llm.stream(prompt_value):
+                pieces.append(chunk.content)
+                yield chunk.content
+
+            self._llm_cache.update(
+                prompt_key, llm_string, [Generation(text="".join(pieces))]
+            )
+
+        return RunnableGenerator(generate)
+
+    def create_qa_chain(self, retriever):
+        """
+        Create a question-answering chain
+
+        Args:
+            retriever: Retriever object from the vector store
+
+        Returns:
+            QA chain that can be invoked with a question
+        """
+        return (
+            {"context": retriever, "question": RunnablePassthrough()}
+            | _QA_PROMPT
+            | self._stream_through_cache(self.fast_llm)
+        )
+
+    def create_summary_chain(self, retriever):
+        """
+        Create a summarization chain
+
+        Args:
+            retriever: Retriever object from the vector store
+
+        Returns:
+            Summary chain that can be invoked with a document
+        """
+        return (
+            {"context": retriever}
+            | _SUMMARY_PROMPT
+            | self._stream_through_cache(self.fast_llm)
+        )
+
+    def create_notes_chain(self, retriever):
+        """
+        Create a notes generation chain
+
+        Args:
+            retriever: Retriever object from the vector store
+
+        Returns:
+            Notes chain that can be invoked with a document
+        """
+        return (
+            {"context": retriever}
+            | _NOTES_PROMPT
+            | self._stream_through_cache(self.strong_llm)
+        )
\ No newline at end of file